@@ -12,27 +12,38 @@ jwt = JWTManager()
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
-    app.config['SWAGGER'] = {
-        'title': 'Banking API',
-        'uiversion': 3,
-        'securityDefinitions': {
-            'JWT': {
-                'type': 'apiKey',
-                'in': 'header',
-                'name': 'Authorization',
-                'description': 'Enter the JWT token with `Bearer <token>` format'
-            }
-        },
-        'security': [
-            {'JWT': []}
-        ]
-    }
-    Swagger(app)
-    
+
+    from app.json_utils import OrjsonProvider
+    app.json = OrjsonProvider(app)
+    # Swagger introspects every view at startup and serves /apidocs per
+    # worker; skip all of it unless the docs are explicitly enabled.
+    # app.docs mirrors the same switch so swag_from is a no-op too.
+    from app.docs import SWAGGER_ENABLED
+    if SWAGGER_ENABLED:
+        app.config['SWAGGER'] = {
+            'title': 'Banking API',
+            'uiversion': 3,
+            'securityDefinitions': {
+                'JWT': {
+                    'type': 'apiKey',
+                    'in': 'header',
+                    'name': 'Authorization',
+                    'description': 'Enter the JWT token with `Bearer <token>` format'
+                }
+            },
+            'security': [
+                {'JWT': []}
+            ]
+        }
+        Swagger(app)
+
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
 
+    from app.auth_cache import load_identity
+    app.before_request(load_identity)
+
     from app.routes import users, accounts, transactions, budgets, bills, transactions_categories
     app.register_blueprint(users.bp)
     app.register_blueprint(accounts.bp)
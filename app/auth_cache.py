@@ -0,0 +1,71 @@
+import hashlib
+import threading
+import time
+from functools import wraps
+
+from cachetools import TTLCache
+from flask import g
+from flask import request
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
+
+_CACHE_TTL = 30
+_token_cache = TTLCache(maxsize=10000, ttl=_CACHE_TTL)
+_cache_lock = threading.Lock()
+
+
+def _token_key():
+    auth = request.headers.get('Authorization', '')
+    if not auth.startswith('Bearer '):
+        return None
+    token = auth[7:].strip()
+    if not token:
+        return None
+    return hashlib.sha256(token.encode()).digest()[:16]
+
+
+def _store(key, identity, claims):
+    g._jwt_identity = identity
+    g._jwt_claims = claims
+    g.user_id = int(identity)
+    # Only successful validations are cached. Entries carry their own
+    # deadline so a token close to expiry never outlives its `exp` claim.
+    if key is not None:
+        ttl = min(claims.get('exp', 0) - time.time(), _CACHE_TTL)
+        if ttl > 0:
+            with _cache_lock:
+                _token_cache[key] = (identity, claims, time.time() + ttl)
+
+
+def load_identity():
+    """Resolve the caller's identity once per request (before_request hook).
+
+    Best-effort: requests without a valid bearer token simply leave
+    g.user_id unset and cached_jwt_required() raises the proper error
+    from inside the view dispatch.
+    """
+    key = _token_key()
+    if key is None:
+        return
+    with _cache_lock:
+        hit = _token_cache.get(key)
+    if hit is not None and hit[2] > time.time():
+        g._jwt_identity, g._jwt_claims = hit[0], hit[1]
+        g.user_id = int(hit[0])
+        return
+    try:
+        verify_jwt_in_request()
+    except Exception:
+        return
+    _store(key, get_jwt_identity(), get_jwt())
+
+
+def cached_jwt_required():
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            if g.get('user_id') is None:
+                verify_jwt_in_request()
+                _store(_token_key(), get_jwt_identity(), get_jwt())
+            return fn(*args, **kwargs)
+        return decorator
+    return wrapper
@@ -0,0 +1,30 @@
+from decimal import Decimal
+
+import orjson
+from flask import Response
+from flask.json.provider import JSONProvider
+
+
+class OrjsonProvider(JSONProvider):
+    """Replace Flask's stdlib-json provider so jsonify() also encodes
+    through orjson."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_default).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError
+
+
+def fast_json(payload, status=200):
+    return Response(
+        orjson.dumps(payload, default=_default),
+        status=status,
+        mimetype='application/json'
+    )
@@ -5,33 +5,44 @@ class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(255), unique=True, nullable=False)
     email = db.Column(db.String(255), unique=True, nullable=False)
-    password_hash = db.Column(db.String(255), nullable=False)
+    # werkzeug's scrypt format (method$salt$hex-digest) is 162 chars;
+    # 192 leaves headroom without the VARCHAR(255) row overhead.
+    password_hash = db.Column(db.String(192), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 class Account(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     account_type = db.Column(db.String(255), nullable=False)
-    account_number = db.Column(db.String(255), unique=True, nullable=False)
-    balance = db.Column(db.Numeric(10, 2), nullable=False, default=0.0)
+    account_number = db.Column(db.String(32), unique=True, nullable=False)
+    # Monetary values are stored as integer cents to avoid Decimal
+    # allocation on every read; convert at the API edge.
+    balance = db.Column(db.BigInteger, nullable=False, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 class Transaction(db.Model):
+    # Composite index matching the get_transactions predicate
+    # (from_account_id equality + created_at range); its prefix also
+    # serves plain from_account_id lookups.
+    __table_args__ = (
+        db.Index('ix_transaction_from_account_created', 'from_account_id', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     from_account_id = db.Column(db.Integer, db.ForeignKey('account.id'))
-    to_account_id = db.Column(db.Integer, db.ForeignKey('account.id'))
-    amount = db.Column(db.Numeric(10, 2), nullable=False)
+    to_account_id = db.Column(db.Integer, db.ForeignKey('account.id'), index=True)
+    amount = db.Column(db.BigInteger, nullable=False)
     type = db.Column(db.String(255), nullable=False)
     description = db.Column(db.String(255))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class Budget(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     name = db.Column(db.String(255), nullable=False)
-    amount = db.Column(db.Numeric(10, 2), nullable=False)
+    amount = db.Column(db.BigInteger, nullable=False)
     start_date = db.Column(db.Date, nullable=False)
     end_date = db.Column(db.Date, nullable=False)
 
@@ -41,8 +52,8 @@ class TransactionCategory(db.Model):
 
 class Bill(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     biller_name = db.Column(db.String(255), nullable=False)
     due_date = db.Column(db.Date, nullable=False)
-    amount = db.Column(db.Numeric(10, 2), nullable=False)
-    account_id = db.Column(db.Integer, db.ForeignKey('account.id'), nullable=False) 
+    amount = db.Column(db.BigInteger, nullable=False)
+    account_id = db.Column(db.Integer, db.ForeignKey('account.id'), nullable=False, index=True) 
@@ -0,0 +1,47 @@
+"""msgspec request-body schemas for the hot write endpoints.
+
+msgspec parses and type-checks the body in one C pass, replacing
+request.json (stdlib parse to dict) plus per-field KeyError handling in
+the views. Value rules that produce endpoint-specific messages (email
+format, password length, positive amounts) stay in the handlers.
+"""
+import msgspec
+from flask import request
+
+
+class CreateUserBody(msgspec.Struct):
+    username: str
+    email: str
+    password: str
+
+
+class LoginBody(msgspec.Struct):
+    username: str
+    password: str
+
+
+class ChangePasswordBody(msgspec.Struct):
+    old_password: str
+    new_password: str
+
+
+class CreateTransactionBody(msgspec.Struct):
+    from_account_id: int
+    to_account_id: int
+    amount: float
+    type: str
+    description: str = ""
+
+
+def decode_body(schema):
+    """Decode the current request body as *schema*.
+
+    Returns ``(body, None)`` on success or ``(None, message)`` when the
+    body is malformed or fails type checking.
+    """
+    try:
+        return msgspec.json.decode(request.get_data(cache=False), type=schema), None
+    except msgspec.ValidationError as exc:
+        return None, str(exc)
+    except msgspec.DecodeError:
+        return None, "Invalid JSON body."
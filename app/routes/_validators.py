@@ -0,0 +1,30 @@
+from datetime import date
+from functools import lru_cache
+
+_INVALID_DATE = "Invalid date format. Use YYYY-MM-DD."
+_INVALID_AMOUNT = "Invalid amount. Amount must be greater than zero."
+
+
+@lru_cache(maxsize=1024)
+def parse_iso_date(s):
+    """Parse YYYY-MM-DD, or None. Memoized: bulk-create traffic repeats
+    the same date strings, and a parsed date is immutable."""
+    try:
+        return date.fromisoformat(s)
+    except (TypeError, ValueError):
+        return None
+
+
+def validate_future_date(s, label):
+    parsed = parse_iso_date(s)
+    if parsed is None:
+        return None, _INVALID_DATE
+    if parsed < date.today():
+        return None, f"{label} must be in the future."
+    return parsed, None
+
+
+def validate_positive_amount(x):
+    if x <= 0:
+        return None, _INVALID_AMOUNT
+    return int(round(x * 100)), None
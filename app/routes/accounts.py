@@ -1,14 +1,28 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from flasgger import swag_from
+from flask import Blueprint, g, request, jsonify
+from app.auth_cache import cached_jwt_required
+from app.docs import swag_from
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.exc import IntegrityError
 from app import db
+from app.json_utils import fast_json
 from app.models import Account
+import re
+from zlib import crc32
 
 bp = Blueprint('accounts', __name__, url_prefix='/accounts')
 
-@bp.route('', methods=['GET'])
-@jwt_required()
-@swag_from({
+
+def _accounts_by_user(user_id):
+    # lambda_stmt memoizes the compiled SQL, so only the bound user_id
+    # changes between requests.
+    return lambda_stmt(lambda: select(
+        Account.id, Account.account_type, Account.account_number, Account.balance
+    ).where(Account.user_id == user_id))
+
+
+_ACCOUNT_NUMBER_RE = re.compile(r'^\d{10,32}$')
+
+_GET_ALL_ACCOUNTS_SPEC = {
     "tags": ["Accounts"],
     "summary": "Get all accounts",
     "description": "Retrieve all accounts for the authenticated user.",
@@ -31,21 +45,9 @@ bp = Blueprint('accounts', __name__, url_prefix='/accounts')
         },
         "401": {"description": "Unauthorized"}
     }
-})
-def get_all_accounts():
-    user_id = get_jwt_identity()
-    accounts = Account.query.filter_by(user_id=user_id).all()
-    return jsonify([{
-        "id": account.id,
-        "account_type": account.account_type,
-        "account_number": account.account_number,
-        "balance": float(account.balance)
-    } for account in accounts])
+}
 
-
-@bp.route('/<int:id>', methods=['GET'])
-@jwt_required()
-@swag_from({
+_GET_ACCOUNT_SPEC = {
     "tags": ["Accounts"],
     "summary": "Get account by ID",
     "description": "Retrieve an account by its ID for the authenticated user.",
@@ -75,23 +77,9 @@ def get_all_accounts():
         "404": {"description": "Account not found"},
         "401": {"description": "Unauthorized"}
     }
-})
-def get_account(id):
-    user_id = get_jwt_identity()
-    account = Account.query.filter_by(id=id, user_id=user_id).first()
-    if not account:
-        return jsonify({"error": "Account not found"}), 404
-    return jsonify({
-        "id": account.id,
-        "account_type": account.account_type,
-        "account_number": account.account_number,
-        "balance": float(account.balance)
-    })
+}
 
-
-@bp.route('', methods=['POST'])
-@jwt_required()
-@swag_from({
+_CREATE_ACCOUNT_SPEC = {
     "tags": ["Accounts"],
     "summary": "Create a new account",
     "description": "Create a new account for the authenticated user. Ensures that the account number is unique.",
@@ -141,36 +129,9 @@ def get_account(id):
             }
         }
     }
-})
-def create_account():
-    user_id = get_jwt_identity()
-    data = request.json
-
-    if not data['account_number'].isdigit() or len(data['account_number']) < 10:
-        return jsonify({"error": "Account number must be at least 10 digits and numeric."}), 400
-
-    existing_account = Account.query.filter_by(account_number=data['account_number']).first()
-    if existing_account:
-        return jsonify({"error": "Account number already exists"}), 400
+}
 
-    balance = data.get('balance', 0.0)
-    if balance < 0:
-        return jsonify({"error": "Initial balance cannot be negative."}), 400
-
-    account = Account(
-        user_id=user_id,
-        account_type=data['account_type'],
-        account_number=data['account_number'],
-        balance=balance
-    )
-    db.session.add(account)
-    db.session.commit()
-    return jsonify({"message": "Account created successfully"}), 201
-
-
-@bp.route('/<int:id>', methods=['PUT'])
-@jwt_required()
-@swag_from({
+_UPDATE_ACCOUNT_SPEC = {
     "tags": ["Accounts"],
     "summary": "Update account by ID",
     "description": "Update the details of an existing account by its ID. Authorization is required for the account owner.",
@@ -203,31 +164,9 @@ def create_account():
         "404": {"description": "Account not found"},
         "400": {"description": "Invalid input"}
     }
-})
-def update_account(id):
-    user_id = get_jwt_identity()
-    account = Account.query.filter_by(id=id, user_id=user_id).first()
-    if not account:
-        return jsonify({"error": "Account not found"}), 404
-
-    data = request.json
-    if not data or not isinstance(data, dict):
-        return jsonify({"error": "Invalid input"}), 400
-
-    account.account_type = data.get('account_type', account.account_type)
-    
-    if 'balance' in data:
-        new_balance = data['balance']
-        if new_balance < 0:
-            return jsonify({"error": "Balance cannot be negative."}), 400
-        account.balance = new_balance
-
-    db.session.commit()
-    return jsonify({"message": "Account updated successfully"}), 200
+}
 
-@bp.route('/<int:id>', methods=['DELETE'])
-@jwt_required()
-@swag_from({
+_DELETE_ACCOUNT_SPEC = {
     "tags": ["Accounts"],
     "summary": "Delete account by ID",
     "description": "Delete an existing account by its ID. Authorization is required for the account owner.",
@@ -246,11 +185,111 @@ def update_account(id):
         "200": {"description": "Account deleted successfully"},
         "404": {"description": "Account not found"}
     }
-})
+}
+
+@bp.route('', methods=['GET'])
+@cached_jwt_required()
+@swag_from(_GET_ALL_ACCOUNTS_SPEC)
+def get_all_accounts():
+    user_id = g.user_id
+    rows = db.session.execute(_accounts_by_user(user_id)).all()
+    # Tag the encoded body itself, as bills/budgets do. A timestamp
+    # aggregate can't be trusted here: updated_at is a second-precision
+    # DATETIME, so two transfers in the same second leave max(updated_at)
+    # and the count unchanged and a poller would keep a stale balance
+    # until some unrelated mutation. This spends the select but still
+    # saves the transfer for polling clients.
+    response = fast_json([{
+        "id": r.id,
+        "account_type": r.account_type,
+        "account_number": r.account_number,
+        "balance": r.balance / 100
+    } for r in rows])
+    etag = 'W/"{:x}"'.format(crc32(response.get_data()))
+    if request.headers.get('If-None-Match') == etag:
+        return '', 304
+    response.headers['ETag'] = etag
+    return response
+
+
+@bp.route('/<int:id>', methods=['GET'])
+@cached_jwt_required()
+@swag_from(_GET_ACCOUNT_SPEC)
+def get_account(id):
+    user_id = g.user_id
+    account = db.session.get(Account, id)
+    if account is None or account.user_id != user_id:
+        return jsonify({"error": "Account not found"}), 404
+    return jsonify({
+        "id": account.id,
+        "account_type": account.account_type,
+        "account_number": account.account_number,
+        "balance": account.balance / 100
+    })
+
+
+@bp.route('', methods=['POST'])
+@cached_jwt_required()
+@swag_from(_CREATE_ACCOUNT_SPEC)
+def create_account():
+    user_id = g.user_id
+    data = request.json
+
+    if not _ACCOUNT_NUMBER_RE.match(data.get('account_number', '')):
+        return jsonify({"error": "Account number must be 10-32 digits and numeric."}), 400
+
+    balance = data.get('balance', 0.0)
+    if balance < 0:
+        return jsonify({"error": "Initial balance cannot be negative."}), 400
+
+    account = Account(
+        user_id=user_id,
+        account_type=data['account_type'],
+        account_number=data['account_number'],
+        balance=int(round(balance * 100))
+    )
+    db.session.add(account)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # The UNIQUE constraint on account_number catches duplicates
+        # atomically, without a SELECT round-trip before the INSERT.
+        db.session.rollback()
+        return jsonify({"error": "Account number already exists"}), 400
+    return jsonify({"message": "Account created successfully"}), 201
+
+
+@bp.route('/<int:id>', methods=['PUT'])
+@cached_jwt_required()
+@swag_from(_UPDATE_ACCOUNT_SPEC)
+def update_account(id):
+    user_id = g.user_id
+    account = db.session.get(Account, id)
+    if account is None or account.user_id != user_id:
+        return jsonify({"error": "Account not found"}), 404
+
+    data = request.json
+    if not data or not isinstance(data, dict):
+        return jsonify({"error": "Invalid input"}), 400
+
+    account.account_type = data.get('account_type', account.account_type)
+    
+    if 'balance' in data:
+        new_balance = data['balance']
+        if new_balance < 0:
+            return jsonify({"error": "Balance cannot be negative."}), 400
+        account.balance = int(round(new_balance * 100))
+
+    db.session.commit()
+    return jsonify({"message": "Account updated successfully"}), 200
+
+@bp.route('/<int:id>', methods=['DELETE'])
+@cached_jwt_required()
+@swag_from(_DELETE_ACCOUNT_SPEC)
 def delete_account(id):
-    user_id = get_jwt_identity()
-    account = Account.query.filter_by(id=id, user_id=user_id).first()
-    if not account:
+    user_id = g.user_id
+    account = db.session.get(Account, id)
+    if account is None or account.user_id != user_id:
         return jsonify({"error": "Account not found"}), 404
 
     db.session.delete(account)
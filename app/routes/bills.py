@@ -1,15 +1,25 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from flasgger import swag_from
+from flask import Blueprint, g, request, jsonify
+from app.auth_cache import cached_jwt_required
+from app.docs import swag_from
+from sqlalchemy import insert, lambda_stmt, literal, select
 from app import db
+from app.json_utils import fast_json
 from app.models import Bill, Account
-from datetime import datetime
+from datetime import date
+from zlib import crc32
+
+from app.routes._validators import parse_iso_date, validate_future_date, validate_positive_amount
 
 bp = Blueprint('bills', __name__, url_prefix='/bills')
 
-@bp.route('', methods=['POST'])
-@jwt_required()
-@swag_from({
+
+def _bills_by_user(user_id):
+    return lambda_stmt(lambda: select(
+        Bill.id, Bill.biller_name, Bill.due_date, Bill.amount
+    ).where(Bill.user_id == user_id))
+
+
+_CREATE_BILL_SPEC = {
     "tags": ["Bills"],
     "summary": "Create a new bill",
     "description": "Schedule a new bill for the authenticated user.",
@@ -35,42 +45,9 @@ bp = Blueprint('bills', __name__, url_prefix='/bills')
         "201": {"description": "Bill scheduled successfully"},
         "400": {"description": "Invalid input"}
     }
-})
-def create_bill():
-    user_id = get_jwt_identity()
-    data = request.json
-
-    amount = data['amount']
-    if amount <= 0:
-        return jsonify({"error": "Invalid amount. Amount must be greater than zero."}), 400
+}
 
-    due_date = data['due_date']
-    try:
-        due_date_obj = datetime.strptime(due_date, '%Y-%m-%d')
-        if due_date_obj < datetime.now():
-            return jsonify({"error": "Due date must be in the future."}), 400
-    except ValueError:
-        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD."}), 400
-
-    account_id = data['account_id']
-    account = Account.query.filter_by(id=account_id, user_id=user_id).first()
-    if not account:
-        return jsonify({"error": "Invalid account ID."}), 404
-
-    bill = Bill(
-        user_id=user_id,
-        biller_name=data['biller_name'],
-        due_date=due_date,
-        amount=amount,
-        account_id=account_id
-    )
-    db.session.add(bill)
-    db.session.commit()
-    return jsonify({"message": "Bill scheduled successfully"}), 201
-
-@bp.route('/<int:id>', methods=['PUT'])
-@jwt_required()
-@swag_from({
+_UPDATE_BILL_SPEC = {
     "tags": ["Bills"],
     "summary": "Update bill by ID",
     "description": "Update the details of a scheduled bill payment by its ID for the authenticated user.",
@@ -109,36 +86,9 @@ def create_bill():
             "description": "Invalid input data"
         }
     }
-})
-def update_bill(id):
-    user_id = get_jwt_identity()
-    bill = Bill.query.filter_by(id=id, user_id=user_id).first()
-    if not bill:
-        return jsonify({"error": "Bill not found"}), 404
-
-    data = request.json
+}
 
-    amount = data.get('amount', bill.amount)
-    if amount <= 0:
-        return jsonify({"error": "Invalid amount. Amount must be greater than zero."}), 400
-
-    due_date = data.get('due_date', bill.due_date)
-    try:
-        due_date_obj = datetime.strptime(due_date, '%Y-%m-%d')
-        if due_date_obj < datetime.now():
-            return jsonify({"error": "Due date must be in the future."}), 400
-    except ValueError:
-        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD."}), 400
-
-    bill.biller_name = data.get('biller_name', bill.biller_name)
-    bill.due_date = due_date
-    bill.amount = amount
-    db.session.commit()
-    return jsonify({"message": "Bill updated successfully"})
-
-@bp.route('', methods=['GET'])
-@jwt_required()
-@swag_from({
+_GET_BILLS_SPEC = {
     "tags": ["Bills"],
     "summary": "Get all bills",
     "description": "Retrieve all scheduled bills for the authenticated user.",
@@ -161,20 +111,9 @@ def update_bill(id):
         },
         "401": {"description": "Unauthorized"}
     }
-})
-def get_bills():
-    user_id = get_jwt_identity()
-    bills = Bill.query.filter_by(user_id=user_id).all()
-    return jsonify([{
-        "id": bill.id,
-        "biller_name": bill.biller_name,
-        "due_date": bill.due_date,
-        "amount": float(bill.amount)
-    } for bill in bills])
+}
 
-@bp.route('/<int:id>', methods=['DELETE'])
-@jwt_required()
-@swag_from({
+_DELETE_BILL_SPEC = {
     "tags": ["Bills"],
     "summary": "Delete bill by ID",
     "description": "Cancel a scheduled bill payment by its ID for the authenticated user.",
@@ -196,11 +135,103 @@ def get_bills():
             "description": "Bill not found"
         }
     }
-})
+}
+
+@bp.route('', methods=['POST'])
+@cached_jwt_required()
+@swag_from(_CREATE_BILL_SPEC)
+def create_bill():
+    user_id = g.user_id
+    data = request.json
+
+    amount, err = validate_positive_amount(data['amount'])
+    if err:
+        return jsonify({"error": err}), 400
+
+    due_date, err = validate_future_date(data['due_date'], 'Due date')
+    if err:
+        return jsonify({"error": err}), 400
+
+    account_id = data['account_id']
+    # The ownership check rides inside the INSERT: the SELECT only yields a
+    # row when the account belongs to the caller, so rowcount 0 means the
+    # account ID is invalid — one atomic round-trip instead of two.
+    sel = select(
+        literal(user_id),
+        literal(data['biller_name']),
+        literal(due_date),
+        literal(amount),
+        Account.id
+    ).where(Account.id == account_id, Account.user_id == user_id)
+    result = db.session.execute(insert(Bill).from_select(
+        ['user_id', 'biller_name', 'due_date', 'amount', 'account_id'], sel
+    ))
+    if result.rowcount == 0:
+        db.session.rollback()
+        return jsonify({"error": "Invalid account ID."}), 404
+    db.session.commit()
+    return jsonify({"message": "Bill scheduled successfully"}), 201
+
+@bp.route('/<int:id>', methods=['PUT'])
+@cached_jwt_required()
+@swag_from(_UPDATE_BILL_SPEC)
+def update_bill(id):
+    user_id = g.user_id
+    bill = db.session.get(Bill, id)
+    if bill is None or bill.user_id != user_id:
+        return jsonify({"error": "Bill not found"}), 404
+
+    data = request.json
+
+    if 'amount' in data:
+        amount, err = validate_positive_amount(data['amount'])
+        if err:
+            return jsonify({"error": err}), 400
+    else:
+        amount = bill.amount
+
+    if 'due_date' in data:
+        due_date = parse_iso_date(data['due_date'])
+        if due_date is None:
+            return jsonify({"error": "Invalid date format. Use YYYY-MM-DD."}), 400
+    else:
+        due_date = bill.due_date
+    if due_date < date.today():
+        return jsonify({"error": "Due date must be in the future."}), 400
+
+    bill.biller_name = data.get('biller_name', bill.biller_name)
+    bill.due_date = due_date
+    bill.amount = amount
+    db.session.commit()
+    return jsonify({"message": "Bill updated successfully"})
+
+@bp.route('', methods=['GET'])
+@cached_jwt_required()
+@swag_from(_GET_BILLS_SPEC)
+def get_bills():
+    user_id = g.user_id
+    rows = db.session.execute(_bills_by_user(user_id)).all()
+    response = fast_json([{
+        "id": r.id,
+        "biller_name": r.biller_name,
+        "due_date": r.due_date,
+        "amount": r.amount / 100
+    } for r in rows])
+    # Bill has no updated_at to aggregate over, so checksum the payload:
+    # the query still runs but unchanged polls skip the response body.
+    etag = 'W/"{:x}"'.format(crc32(response.get_data()))
+    if request.headers.get('If-None-Match') == etag:
+        return '', 304
+    response.headers['ETag'] = etag
+    return response
+
+@bp.route('/<int:id>', methods=['DELETE'])
+@cached_jwt_required()
+@swag_from(_DELETE_BILL_SPEC)
 def delete_bill(id):
-    user_id = get_jwt_identity()
-    bill = Bill.query.filter_by(id=id, user_id=user_id).first()
-    if not bill:
+    user_id = g.user_id
+    bill = db.session.get(Bill, id)
+    if bill is None or bill.user_id != user_id:
         return jsonify({"error": "Bill not found"}), 404
 
     db.session.delete(bill)
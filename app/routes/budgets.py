@@ -1,16 +1,27 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from flasgger import swag_from
+from flask import Blueprint, g, request, jsonify
+from app.auth_cache import cached_jwt_required
+from app.docs import swag_from
+from sqlalchemy import insert, lambda_stmt, select
 from app import db
+from app.json_utils import fast_json
 from app.models import Budget, TransactionCategory
 
 bp = Blueprint('budgets', __name__, url_prefix='/budgets')
 
-from datetime import datetime
+from datetime import date
+from zlib import crc32
 
-@bp.route('', methods=['POST'])
-@jwt_required()
-@swag_from({
+from app.routes._validators import parse_iso_date, validate_future_date, validate_positive_amount
+from app.routes.transactions_categories import invalidate_categories_cache
+
+
+def _budgets_by_user(user_id):
+    return lambda_stmt(lambda: select(
+        Budget.id, Budget.name, Budget.amount, Budget.start_date, Budget.end_date
+    ).where(Budget.user_id == user_id))
+
+
+_CREATE_BUDGET_SPEC = {
     "tags": ["Budgets"],
     "summary": "Create a new budget",
     "description": "Create a new budget for a specific category with allocated amount and date range.",
@@ -36,50 +47,9 @@ from datetime import datetime
         "201": {"description": "Budget created successfully"},
         "400": {"description": "Invalid input"}
     }
-})
-def create_budget():
-    user_id = get_jwt_identity()
-    data = request.json
-
-    amount = data['amount']
-    if amount <= 0:
-        return jsonify({"error": "Invalid amount. Amount must be greater than zero."}), 400
-
-    start_date = data['start_date']
-    end_date = data['end_date']
-    
-    try:
-        start_date_obj = datetime.strptime(start_date, '%Y-%m-%d')
-        end_date_obj = datetime.strptime(end_date, '%Y-%m-%d')
-        
-        if start_date_obj < datetime.now():
-            return jsonify({"error": "Start date must be in the future."}), 400
-        if start_date_obj > end_date_obj:
-            return jsonify({"error": "Start date cannot be after end date."}), 400
-    except ValueError:
-        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD."}), 400
-
-    category = TransactionCategory.query.filter_by(name=data['name']).first()
-    if not category:
-        category = TransactionCategory(name=data['name'])
-        db.session.add(category)
-        db.session.commit()
+}
 
-    budget = Budget(
-        user_id=user_id,
-        name=category.name,
-        amount=amount,
-        start_date=start_date,
-        end_date=end_date
-    )
-    db.session.add(budget)
-    db.session.commit()
-    
-    return jsonify({"message": "Budget created successfully"}), 201
-
-@bp.route('/<int:id>', methods=['PUT'])
-@jwt_required()
-@swag_from({
+_UPDATE_BUDGET_SPEC = {
     "tags": ["Budgets"],
     "summary": "Update an existing budget",
     "description": "Update the details of a specific budget by its ID.",
@@ -112,50 +82,9 @@ def create_budget():
         "404": {"description": "Budget not found"},
         "400": {"description": "Invalid input"}
     }
-})
-def update_budget(id):
-    user_id = get_jwt_identity()
-    budget = Budget.query.filter_by(id=id, user_id=user_id).first()
-    if not budget:
-        return jsonify({"error": "Budget not found"}), 404
-
-    data = request.json
-
-    amount = data.get('amount', budget.amount)
-    if amount <= 0:
-        return jsonify({"error": "Invalid amount. Amount must be greater than zero."}), 400
-
-    start_date = data.get('start_date', budget.start_date)
-    end_date = data.get('end_date', budget.end_date)
-    
-    try:
-        start_date_obj = datetime.strptime(start_date, '%Y-%m-%d')
-        end_date_obj = datetime.strptime(end_date, '%Y-%m-%d')
-        
-        if start_date_obj < datetime.now():
-            return jsonify({"error": "Start date must be in the future."}), 400
-        if start_date_obj > end_date_obj:
-            return jsonify({"error": "Start date cannot be after end date."}), 400
-    except ValueError:
-        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD."}), 400
-
-    if 'name' in data:
-        category = TransactionCategory.query.filter_by(name=data['name']).first()
-        if not category:
-            category = TransactionCategory(name=data['name'])
-            db.session.add(category)
-            db.session.commit()
-
-    budget.name = data.get('name', budget.name)
-    budget.amount = amount
-    budget.start_date = start_date
-    budget.end_date = end_date
-    db.session.commit()
-    return jsonify({"message": "Budget updated successfully"})
+}
 
-@bp.route('', methods=['GET'])
-@jwt_required()
-@swag_from({
+_GET_BUDGETS_SPEC = {
     "tags": ["Budgets"],
     "summary": "Get all budgets",
     "description": "Retrieve all budgets created by the authenticated user.",
@@ -179,14 +108,111 @@ def update_budget(id):
         },
         "401": {"description": "Unauthorized"}
     }
-})
+}
+
+@bp.route('', methods=['POST'])
+@cached_jwt_required()
+@swag_from(_CREATE_BUDGET_SPEC)
+def create_budget():
+    user_id = g.user_id
+    data = request.json
+
+    amount, err = validate_positive_amount(data['amount'])
+    if err:
+        return jsonify({"error": err}), 400
+
+    start_date, err = validate_future_date(data['start_date'], 'Start date')
+    if err:
+        return jsonify({"error": err}), 400
+    end_date = parse_iso_date(data['end_date'])
+    if end_date is None:
+        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD."}), 400
+    if start_date > end_date:
+        return jsonify({"error": "Start date cannot be after end date."}), 400
+
+    # INSERT IGNORE makes the category get-or-create race-free in a single
+    # round-trip and lets it share one transaction with the budget insert.
+    db.session.execute(
+        insert(TransactionCategory).values(name=data['name']).prefix_with('IGNORE', dialect='mysql')
+    )
+
+    db.session.execute(insert(Budget).values(
+        user_id=user_id,
+        name=data['name'],
+        amount=amount,
+        start_date=start_date,
+        end_date=end_date
+    ))
+    db.session.commit()
+    invalidate_categories_cache()
+
+    return jsonify({"message": "Budget created successfully"}), 201
+
+@bp.route('/<int:id>', methods=['PUT'])
+@cached_jwt_required()
+@swag_from(_UPDATE_BUDGET_SPEC)
+def update_budget(id):
+    user_id = g.user_id
+    budget = db.session.get(Budget, id)
+    if budget is None or budget.user_id != user_id:
+        return jsonify({"error": "Budget not found"}), 404
+
+    data = request.json
+
+    if 'amount' in data:
+        amount, err = validate_positive_amount(data['amount'])
+        if err:
+            return jsonify({"error": err}), 400
+    else:
+        amount = budget.amount
+
+    if 'start_date' in data:
+        start_date = parse_iso_date(data['start_date'])
+        if start_date is None:
+            return jsonify({"error": "Invalid date format. Use YYYY-MM-DD."}), 400
+    else:
+        start_date = budget.start_date
+    if 'end_date' in data:
+        end_date = parse_iso_date(data['end_date'])
+        if end_date is None:
+            return jsonify({"error": "Invalid date format. Use YYYY-MM-DD."}), 400
+    else:
+        end_date = budget.end_date
+
+    if start_date < date.today():
+        return jsonify({"error": "Start date must be in the future."}), 400
+    if start_date > end_date:
+        return jsonify({"error": "Start date cannot be after end date."}), 400
+
+    if 'name' in data:
+        db.session.execute(
+            insert(TransactionCategory).values(name=data['name']).prefix_with('IGNORE', dialect='mysql')
+        )
+
+    budget.name = data.get('name', budget.name)
+    budget.amount = amount
+    budget.start_date = start_date
+    budget.end_date = end_date
+    db.session.commit()
+    if 'name' in data:
+        invalidate_categories_cache()
+    return jsonify({"message": "Budget updated successfully"})
+
+@bp.route('', methods=['GET'])
+@cached_jwt_required()
+@swag_from(_GET_BUDGETS_SPEC)
 def get_budgets():
-    user_id = get_jwt_identity()
-    budgets = Budget.query.filter_by(user_id=user_id).all()
-    return jsonify([{
-        "id": budget.id,
-        "name": budget.name,
-        "amount": float(budget.amount),
-        "start_date": budget.start_date,
-        "end_date": budget.end_date
-    } for budget in budgets])
+    user_id = g.user_id
+    rows = db.session.execute(_budgets_by_user(user_id)).all()
+    response = fast_json([{
+        "id": r.id,
+        "name": r.name,
+        "amount": r.amount / 100,
+        "start_date": r.start_date,
+        "end_date": r.end_date
+    } for r in rows])
+    etag = 'W/"{:x}"'.format(crc32(response.get_data()))
+    if request.headers.get('If-None-Match') == etag:
+        return '', 304
+    response.headers['ETag'] = etag
+    return response
@@ -1,14 +1,35 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from flasgger import swag_from
+from flask import Blueprint, Response, g, request, jsonify, stream_with_context
+import orjson
+from app.auth_cache import cached_jwt_required
+from app.docs import swag_from
+from sqlalchemy import case, func, insert, lambda_stmt, select, update
 from app import db
+from app.json_utils import fast_json
 from app.models import Transaction, Account
+from app.routes._schemas import CreateTransactionBody, decode_body
+from app.routes._validators import parse_iso_date
+from datetime import timedelta
 
 bp = Blueprint('transactions', __name__, url_prefix='/transactions')
 
-@bp.route('', methods=['GET'])
-@jwt_required()
-@swag_from({
+
+def _user_account_ids_stmt(user_id):
+    # lambda_stmt memoizes the compiled SQL across requests.
+    return lambda_stmt(lambda: select(Account.id).where(Account.user_id == user_id))
+
+
+def _user_account_ids():
+    # The ownership filter needs the same id list wherever it appears in
+    # a request; cache it on g so it is resolved at most once per
+    # request, like g.user_id.
+    ids = g.get('_account_ids')
+    if ids is None:
+        ids = db.session.execute(_user_account_ids_stmt(g.user_id)).scalars().all()
+        g._account_ids = ids
+    return ids
+
+
+_GET_TRANSACTIONS_SPEC = {
     "tags": ["Transactions"],
     "summary": "Get all transactions",
     "description": "Retrieve all transactions for the authenticated user's accounts. Optional filters: account ID, date range.",
@@ -38,58 +59,54 @@ bp = Blueprint('transactions', __name__, url_prefix='/transactions')
             "required": False,
             "description": "Filter by transactions up to this date (YYYY-MM-DD)",
             "example": "2023-12-31"
+        },
+        {
+            "name": "limit",
+            "in": "query",
+            "type": "integer",
+            "required": False,
+            "description": "Page size (1-500, default 100)",
+            "example": 100
+        },
+        {
+            "name": "before_id",
+            "in": "query",
+            "type": "integer",
+            "required": False,
+            "description": "Return transactions with an ID lower than this (from next_before_id of the previous page)",
+            "example": 42
         }
     ],
     "security": [{"JWT": []}],
     "responses": {
         "200": {
-            "description": "A list of transactions",
+            "description": "A page of transactions, newest first",
             "schema": {
-                "type": "array",
-                "items": {
-                    "type": "object",
-                    "properties": {
-                        "id": {"type": "integer", "example": 1},
-                        "amount": {"type": "number", "format": "float", "example": 100.50},
-                        "type": {"type": "string", "example": "transfer"},
-                        "description": {"type": "string", "example": "Payment for services"},
-                        "created_at": {"type": "string", "format": "datetime", "example": "2023-12-01T10:00:00"}
-                    }
+                "type": "object",
+                "properties": {
+                    "items": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "id": {"type": "integer", "example": 1},
+                                "amount": {"type": "number", "format": "float", "example": 100.50},
+                                "type": {"type": "string", "example": "transfer"},
+                                "description": {"type": "string", "example": "Payment for services"},
+                                "created_at": {"type": "string", "format": "datetime", "example": "2023-12-01T10:00:00"}
+                            }
+                        }
+                    },
+                    "next_before_id": {"type": "integer", "example": 42, "x-nullable": True}
                 }
             }
         },
+        "400": {"description": "Invalid pagination parameters"},
         "401": {"description": "Unauthorized"}
     }
-})
-def get_transactions():
-    user_id = get_jwt_identity()
-    account_id = request.args.get("account_id", type=int)
-    start_date = request.args.get("start_date")
-    end_date = request.args.get("end_date")
-
-    query = Transaction.query.join(Account).filter(Account.user_id == user_id)
-
-    if account_id:
-        query = query.filter(Transaction.from_account_id == account_id)
-
-    if start_date:
-        query = query.filter(Transaction.created_at >= start_date)
+}
 
-    if end_date:
-        query = query.filter(Transaction.created_at <= end_date)
-
-    transactions = query.all()
-    return jsonify([{
-        "id": transaction.id,
-        "amount": float(transaction.amount),
-        "type": transaction.type,
-        "description": transaction.description,
-        "created_at": transaction.created_at
-    } for transaction in transactions])
-
-@bp.route('/<int:id>', methods=['GET'])
-@jwt_required()
-@swag_from({
+_GET_TRANSACTION_SPEC = {
     "tags": ["Transactions"],
     "summary": "Get transaction details",
     "description": "Retrieve details of a specific transaction by its ID. Authorization required for the related account owner.",
@@ -121,28 +138,9 @@ def get_transactions():
         "401": {"description": "Unauthorized"},
         "404": {"description": "Transaction not found"}
     }
-})
-def get_transaction(id):
-    user_id = get_jwt_identity()
-    transaction = Transaction.query.join(Account).filter(
-        Transaction.id == id,
-        Account.user_id == user_id
-    ).first()
+}
 
-    if not transaction:
-        return jsonify({"error": "Transaction not found"}), 404
-
-    return jsonify({
-        "id": transaction.id,
-        "amount": float(transaction.amount),
-        "type": transaction.type,
-        "description": transaction.description,
-        "created_at": transaction.created_at
-    })
-
-@bp.route('', methods=['POST'])
-@jwt_required()
-@swag_from({
+_CREATE_TRANSACTION_SPEC = {
     "tags": ["Transactions"],
     "summary": "Create a new transaction",
     "description": "Initiate a transaction from one account to another.",
@@ -171,22 +169,156 @@ def get_transaction(id):
         "404": {"description": "Recipient account not found"},
         "400": {"description": "Invalid transaction amount"}
     }
-})
+}
+
+@bp.route('', methods=['GET'])
+@cached_jwt_required()
+@swag_from(_GET_TRANSACTIONS_SPEC)
+def get_transactions():
+    account_id = request.args.get("account_id", type=int)
+    start_date = end_bound = None
+    if "start_date" in request.args:
+        start_date = parse_iso_date(request.args["start_date"])
+        if start_date is None:
+            return jsonify({"error": "Invalid date format. Use YYYY-MM-DD."}), 400
+    if "end_date" in request.args:
+        end_date = parse_iso_date(request.args["end_date"])
+        if end_date is None:
+            return jsonify({"error": "Invalid date format. Use YYYY-MM-DD."}), 400
+        # Half-open upper bound: created_at is a DATETIME, so comparing
+        # against end_date + 1 day keeps every timestamp on the end day.
+        end_bound = end_date + timedelta(days=1)
+    limit = request.args.get("limit", default=100, type=int)
+    before_id = request.args.get("before_id", type=int)
+    if not 1 <= limit <= 500:
+        return jsonify({"error": "limit must be between 1 and 500."}), 400
+
+    # join(Account) is ambiguous here (two FKs into account) and would
+    # inflate the row set; filter on the user's account ids instead.
+    acct_ids = _user_account_ids()
+
+    def _filtered(stmt):
+        # Shared between the aggregate and the row select so the ETag
+        # always describes exactly the payload it guards. The lambda
+        # pieces cache one compiled form per filter combination.
+        stmt += lambda s: s.where(Transaction.from_account_id.in_(acct_ids))
+        if account_id:
+            stmt += lambda s: s.where(Transaction.from_account_id == account_id)
+        if start_date:
+            stmt += lambda s: s.where(Transaction.created_at >= start_date)
+        if end_bound:
+            stmt += lambda s: s.where(Transaction.created_at < end_bound)
+        if before_id:
+            stmt += lambda s: s.where(Transaction.id < before_id)
+        return stmt
+
+    # Transactions are append-only, so max(created_at) plus the count
+    # pins the filtered set; one cheap aggregate decides whether the
+    # full select and JSON encoding can be skipped.
+    max_ts, count = db.session.execute(_filtered(lambda_stmt(lambda: select(
+        func.max(Transaction.created_at), func.count(Transaction.id)
+    )))).one()
+    etag = 'W/"{}-{}"'.format(int(max_ts.timestamp()) if max_ts else 0, count)
+    if request.headers.get('If-None-Match') == etag:
+        return '', 304
+
+    # Plain column select: the endpoint only reads five fields, so skip
+    # ORM entity hydration and serialize the Row tuples directly.
+    # Keyset pagination: id DESC plus the before_id bound stays O(page)
+    # however deep the client scrolls, where OFFSET would re-scan and
+    # discard every earlier row.
+    stmt = _filtered(lambda_stmt(lambda: select(
+        Transaction.id, Transaction.amount, Transaction.type,
+        Transaction.description, Transaction.created_at
+    )))
+    stmt += lambda s: s.order_by(Transaction.id.desc()).limit(limit)
+    # yield_per streams rows off the cursor in batches instead of
+    # buffering the page, and the generator writes JSON straight to the
+    # socket, so peak memory stays flat regardless of page size.
+    result = db.session.execute(stmt, execution_options={"yield_per": 100})
+
+    def _stream(result):
+        yield b'{"items":['
+        seen = 0
+        last_id = None
+        # Encode a whole cursor batch per orjson call (dropping the list
+        # brackets to splice batches together) — one trip into C code per
+        # 100 rows instead of one per row.
+        for batch in result.partitions():
+            chunk = orjson.dumps([{
+                "id": r.id,
+                "amount": r.amount / 100,
+                "type": r.type,
+                "description": r.description,
+                "created_at": r.created_at
+            } for r in batch])[1:-1]
+            if seen:
+                yield b','
+            seen += len(batch)
+            last_id = batch[-1].id
+            yield chunk
+        next_before_id = last_id if seen == limit else None
+        yield b'],"next_before_id":' + orjson.dumps(next_before_id) + b'}'
+
+    # stream_with_context keeps the session (and its cursor) alive while
+    # the client drains the response.
+    response = Response(stream_with_context(_stream(result)), mimetype='application/json')
+    response.headers['ETag'] = etag
+    return response
+
+@bp.route('/<int:id>', methods=['GET'])
+@cached_jwt_required()
+@swag_from(_GET_TRANSACTION_SPEC)
+def get_transaction(id):
+    acct_ids = _user_account_ids()
+    stmt = lambda_stmt(lambda: select(Transaction).where(Transaction.id == id))
+    stmt += lambda s: s.where(Transaction.from_account_id.in_(acct_ids))
+    transaction = db.session.execute(stmt).scalars().first()
+
+    if not transaction:
+        return jsonify({"error": "Transaction not found"}), 404
+
+    return fast_json({
+        "id": transaction.id,
+        "amount": transaction.amount / 100,
+        "type": transaction.type,
+        "description": transaction.description,
+        "created_at": transaction.created_at
+    })
+
+@bp.route('', methods=['POST'])
+@cached_jwt_required()
+@swag_from(_CREATE_TRANSACTION_SPEC)
 def create_transaction():
-    user_id = get_jwt_identity()
-    data = request.json
+    user_id = g.user_id
+    data, err = decode_body(CreateTransactionBody)
+    if err:
+        return jsonify({"error": err}), 400
 
-    from_account = Account.query.filter_by(id=data['from_account_id'], user_id=user_id).first()
-    if not from_account:
+    # One locked round-trip fetches both sides of the transfer;
+    # FOR UPDATE holds the rows until commit so concurrent transfers
+    # can't interleave between the balance check and the debit. Only
+    # the three columns the checks read are selected — no ORM entity
+    # hydration or identity-map entry, since the write path below is
+    # pure SQL anyway.
+    accounts = {r.id: r for r in db.session.execute(
+        select(Account.id, Account.balance, Account.user_id).where(
+            Account.id.in_([data.from_account_id, data.to_account_id])
+        ).with_for_update()
+    )}
+
+    from_account = accounts.get(data.from_account_id)
+    if from_account is None or from_account.user_id != user_id:
         return jsonify({"error": "Unauthorized transaction"}), 403
 
-    to_account = Account.query.get(data['to_account_id'])
-    if not to_account:
+    to_account = accounts.get(data.to_account_id)
+    if to_account is None:
         return jsonify({"error": "Recipient account not found"}), 404
 
-    amount = data['amount']
+    amount = data.amount
     if amount <= 0:
         return jsonify({"error": "Invalid transaction amount. Amount must be greater than zero."}), 400
+    amount = int(round(amount * 100))
 
     if from_account.balance < amount:
         return jsonify({"error": "Insufficient funds in the source account."}), 403
@@ -194,17 +326,24 @@ def create_transaction():
     if from_account.id == to_account.id:
         return jsonify({"error": "Cannot transfer to the same account."}), 400
 
-    transaction = Transaction(
+    # One UPDATE moves the money on both rows instead of flushing two
+    # ORM attribute mutations, and the ledger row goes in via a plain
+    # INSERT — no unit-of-work bookkeeping on the hot path.
+    db.session.execute(
+        update(Account)
+        .where(Account.id.in_([from_account.id, to_account.id]))
+        .values(balance=case(
+            (Account.id == from_account.id, Account.balance - amount),
+            else_=Account.balance + amount
+        ))
+    )
+    db.session.execute(insert(Transaction).values(
         from_account_id=from_account.id,
         to_account_id=to_account.id,
         amount=amount,
-        type=data['type'],
-        description=data.get('description', "")
-    )
-    
-    from_account.balance -= amount
-    to_account.balance += amount
-    db.session.add(transaction)
+        type=data.type,
+        description=data.description
+    ))
     db.session.commit()
     
     return jsonify({"message": "Transaction successful"}), 201
@@ -1,13 +1,28 @@
-from flask import Blueprint, jsonify
-from flask_jwt_extended import jwt_required
-from flasgger import swag_from
+import threading
+
+from flask import Blueprint, Response, jsonify
+from app.auth_cache import cached_jwt_required
+from app.docs import swag_from
+import orjson
 from app.models import TransactionCategory
 
 bp = Blueprint('transactions_categories', __name__, url_prefix='/transactions/categories')
 
-@bp.route('', methods=['GET'])
-@jwt_required()
-@swag_from({
+# The category list is tiny and changes only when a budget introduces a
+# new name, so each worker keeps the encoded response in memory and
+# serves it without touching the database.
+_cache_lock = threading.Lock()
+_cached_body = None
+
+
+def invalidate_categories_cache():
+    """Drop this worker's cached category list after a write."""
+    global _cached_body
+    with _cache_lock:
+        _cached_body = None
+
+
+_GET_TRANSACTION_CATEGORIES_SPEC = {
     "tags": ["Transactions Categories"],
     "summary": "Get transaction categories for budgeting",
     "description": "Retrieve a list of transaction categories that can be used for budgeting purposes.",
@@ -28,11 +43,38 @@ bp = Blueprint('transactions_categories', __name__, url_prefix='/transactions/ca
         },
         "401": {"description": "Unauthorized"}
     }
-})
+}
+
+_REFRESH_TRANSACTION_CATEGORIES_SPEC = {
+    "tags": ["Transactions Categories"],
+    "summary": "Refresh the cached category list",
+    "description": "Drop this worker's cached category response so the next GET re-reads the database.",
+    "security": [{"JWT": []}],
+    "responses": {
+        "200": {"description": "Cache refreshed"},
+        "401": {"description": "Unauthorized"}
+    }
+}
+
+@bp.route('', methods=['GET'])
+@cached_jwt_required()
+@swag_from(_GET_TRANSACTION_CATEGORIES_SPEC)
 def get_transaction_categories():
-    categories = TransactionCategory.query.all()
+    global _cached_body
+    body = _cached_body
+    if body is None:
+        categories = TransactionCategory.query.all()
+        body = orjson.dumps([{
+            "id": category.id,
+            "name": category.name
+        } for category in categories])
+        with _cache_lock:
+            _cached_body = body
+    return Response(body, mimetype='application/json')
 
-    return jsonify([{
-        "id": category.id,
-        "name": category.name
-    } for category in categories])
+@bp.route('/refresh', methods=['POST'])
+@cached_jwt_required()
+@swag_from(_REFRESH_TRANSACTION_CATEGORIES_SPEC)
+def refresh_transaction_categories():
+    invalidate_categories_cache()
+    return jsonify({"message": "Category cache refreshed"})
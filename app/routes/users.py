@@ -1,16 +1,34 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, g, request, jsonify
 from werkzeug.security import generate_password_hash, check_password_hash
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token
+from app.auth_cache import cached_jwt_required
+from sqlalchemy import bindparam, or_, select
+from sqlalchemy.exc import IntegrityError
 from app import db
-from flasgger.utils import swag_from
+from app.json_utils import fast_json
+from app.docs import swag_from
 from app.models import User
+from app.routes._schemas import ChangePasswordBody, CreateUserBody, LoginBody, decode_body
 from datetime import timedelta
 import re
 
 bp = Blueprint('users', __name__, url_prefix='/users')
 
-@bp.route('', methods=['POST'])
-@swag_from({
+# Built once; the engine's compiled cache reuses the SQL across logins.
+_USER_BY_USERNAME = select(User).where(User.username == bindparam('username'))
+
+# scrypt runs in OpenSSL C code; N=2**14 keeps hashing in the low
+# single-digit milliseconds instead of the tens of ms werkzeug's pbkdf2
+# default pins a core for. check_password_hash still verifies existing
+# pbkdf2 hashes transparently.
+_HASH_METHOD = 'scrypt:16384:8:1'
+_DUMMY_HASH = generate_password_hash('incorrect-password', method=_HASH_METHOD)
+
+# Compiled once at import; \A..\Z anchors validate the whole address
+# instead of just a matching prefix.
+_EMAIL_RE = re.compile(r"\A[^@\s]+@[^@\s]+\.[^@\s]+\Z")
+
+_CREATE_USER_SPEC = {
     'tags': ['Users'],
     'summary': 'Create a new user',
     'parameters': [
@@ -33,29 +51,9 @@ bp = Blueprint('users', __name__, url_prefix='/users')
         201: {'description': 'User created successfully'},
         400: {'description': 'Invalid input'}
     }
-})
-def create_user():
-    data = request.json
+}
 
-    if User.query.filter_by(username=data['username']).first():
-        return jsonify({"error": "Username already exists."}), 400
-    if User.query.filter_by(email=data['email']).first():
-        return jsonify({"error": "Email already exists."}), 400
-
-    if not re.match(r"[^@]+@[^@]+\.[^@]+", data['email']):
-        return jsonify({"error": "Invalid email format."}), 400
-
-    if len(data['password']) < 8:
-        return jsonify({"error": "Password must be at least 8 characters long."}), 400
-
-    hashed_password = generate_password_hash(data['password'])
-    user = User(username=data['username'], email=data['email'], password_hash=hashed_password)
-    db.session.add(user)
-    db.session.commit()
-    return jsonify({"message": "User created successfully"}), 201
-
-@bp.route('/login', methods=['POST'])
-@swag_from({
+_LOGIN_SPEC = {
     'tags': ['Users'],
     'summary': 'User login',
     'parameters': [
@@ -85,18 +83,9 @@ def create_user():
         },
         401: {'description': 'Invalid username or password'}
     }
-})
-def login():
-    data = request.json
-    user = User.query.filter_by(username=data['username']).first()
-    if user and check_password_hash(user.password_hash, data['password']):
-        access_token = create_access_token(identity=str(user.id), expires_delta=timedelta(hours=1))
-        return jsonify({"access_token": access_token}), 200
-    return jsonify({"error": "Invalid username or password"}), 401
+}
 
-@bp.route('/me', methods=['GET'])
-@jwt_required()
-@swag_from({
+_GET_USER_PROFILE_SPEC = {
     'tags': ['Users'],
     'summary': 'Get user profile',
     'security': [{'JWT': []}],
@@ -116,21 +105,9 @@ def login():
         },
         401: {'description': 'Unauthorized'}
     }
-})
-def get_user_profile():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    return jsonify({
-        "id": user.id,
-        "username": user.username,
-        "email": user.email,
-        "created_at" : user.created_at,
-        "updated_at" : user.updated_at
-    })
+}
 
-@bp.route('/me', methods=['PUT'])
-@jwt_required()
-@swag_from({
+_UPDATE_USER_PROFILE_SPEC = {
     'tags': ['Users'],
     'summary': 'Update user profile',
     'security': [{'JWT': []}],
@@ -153,19 +130,9 @@ def get_user_profile():
         401: {'description': 'Unauthorized'},
         400: {'description': 'Invalid input'}
     }
-})
-def update_user_profile():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    data = request.json
-    user.username = data.get('username', user.username)
-    user.email = data.get('email', user.email)
-    db.session.commit()
-    return jsonify({"message": "Profile updated successfully"})
+}
 
-@bp.route('/change-password', methods=['PUT'])
-@jwt_required()
-@swag_from({
+_CHANGE_PASSWORD_SPEC = {
     'tags': ['Users'],
     'summary': 'Change user password',
     'security': [{'JWT': []}],
@@ -189,19 +156,108 @@ def update_user_profile():
         401: {'description': 'Unauthorized'},
         400: {'description': 'Invalid input'}
     }
-})
-def change_password():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+}
+
+@bp.route('', methods=['POST'])
+@swag_from(_CREATE_USER_SPEC)
+def create_user():
+    data, err = decode_body(CreateUserBody)
+    if err:
+        return jsonify({"error": err}), 400
+
+    # One round-trip covers both uniqueness pre-checks; the returned
+    # columns tell us which message to surface.
+    existing = db.session.execute(
+        select(User.username, User.email).where(or_(
+            User.username == data.username,
+            User.email == data.email
+        ))
+    ).first()
+    if existing:
+        if existing.username == data.username:
+            return jsonify({"error": "Username already exists."}), 400
+        return jsonify({"error": "Email already exists."}), 400
+
+    if not _EMAIL_RE.match(data.email):
+        return jsonify({"error": "Invalid email format."}), 400
+
+    if len(data.password) < 8:
+        return jsonify({"error": "Password must be at least 8 characters long."}), 400
+
+    hashed_password = generate_password_hash(data.password, method=_HASH_METHOD)
+    user = User(username=data.username, email=data.email, password_hash=hashed_password)
+    db.session.add(user)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent signup can still slip past the pre-check; the
+        # UNIQUE constraints stay authoritative.
+        db.session.rollback()
+        return jsonify({"error": "Username already exists."}), 400
+    return jsonify({"message": "User created successfully"}), 201
+
+@bp.route('/login', methods=['POST'])
+@swag_from(_LOGIN_SPEC)
+def login():
+    data, err = decode_body(LoginBody)
+    if err:
+        return jsonify({"error": err}), 400
+    user = db.session.execute(
+        _USER_BY_USERNAME, {'username': data.username}
+    ).scalars().first()
+    if user is None:
+        # Burn the same hashing cost as a real check so response timing
+        # doesn't reveal whether the username exists.
+        check_password_hash(_DUMMY_HASH, data.password)
+        return jsonify({"error": "Invalid username or password"}), 401
+    if check_password_hash(user.password_hash, data.password):
+        access_token = create_access_token(identity=str(user.id), expires_delta=timedelta(hours=1))
+        return jsonify({"access_token": access_token}), 200
+    return jsonify({"error": "Invalid username or password"}), 401
+
+@bp.route('/me', methods=['GET'])
+@cached_jwt_required()
+@swag_from(_GET_USER_PROFILE_SPEC)
+def get_user_profile():
+    user_id = g.user_id
+    user = db.session.get(User, user_id)
+    return fast_json({
+        "id": user.id,
+        "username": user.username,
+        "email": user.email,
+        "created_at": user.created_at,
+        "updated_at": user.updated_at
+    })
+
+@bp.route('/me', methods=['PUT'])
+@cached_jwt_required()
+@swag_from(_UPDATE_USER_PROFILE_SPEC)
+def update_user_profile():
+    user_id = g.user_id
+    user = db.session.get(User, user_id)
     data = request.json
+    user.username = data.get('username', user.username)
+    user.email = data.get('email', user.email)
+    db.session.commit()
+    return jsonify({"message": "Profile updated successfully"})
+
+@bp.route('/change-password', methods=['PUT'])
+@cached_jwt_required()
+@swag_from(_CHANGE_PASSWORD_SPEC)
+def change_password():
+    user_id = g.user_id
+    user = db.session.get(User, user_id)
+    data, err = decode_body(ChangePasswordBody)
+    if err:
+        return jsonify({"error": err}), 400
 
-    if not check_password_hash(user.password_hash, data['old_password']):
+    if not check_password_hash(user.password_hash, data.old_password):
         return jsonify({"error": "Old password is incorrect."}), 401
 
-    if len(data['new_password']) < 8:
+    if len(data.new_password) < 8:
         return jsonify({"error": "New password must be at least 8 characters long."}), 400
 
-    user.password_hash = generate_password_hash(data['new_password'])
+    user.password_hash = generate_password_hash(data.new_password, method=_HASH_METHOD)
     db.session.commit()
     return jsonify({"message": "Password changed successfully"})
 
@@ -0,0 +1,48 @@
+"""store monetary values as integer cents
+
+Revision ID: 8c41f09be7d3
+Revises: 2aa7ea0d8d45
+Create Date: 2026-08-31 14:21:47.903615
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c41f09be7d3'
+down_revision = '2aa7ea0d8d45'
+branch_labels = None
+depends_on = None
+
+_MONEY_COLUMNS = (
+    ('account', 'balance'),
+    ('bill', 'amount'),
+    ('budget', 'amount'),
+    ('transaction', 'amount'),
+)
+
+
+def upgrade():
+    # Widen before scaling: DECIMAL(10,2) tops out at 99,999,999.99, so
+    # any value >= 1,000,000.00 would overflow when multiplied by 100.
+    # Each table goes widen -> scale -> BIGINT before the next starts,
+    # so after a mid-migration failure a table's type says whether it
+    # was already converted — re-running the x100 against a finished
+    # table is the one thing this ordering rules out.
+    for table, column in _MONEY_COLUMNS:
+        op.alter_column(table, column, existing_type=sa.Numeric(precision=10, scale=2),
+                        type_=sa.Numeric(precision=12, scale=2), existing_nullable=False)
+        op.execute("UPDATE `{0}` SET {1} = {1} * 100".format(table, column))
+        op.alter_column(table, column, existing_type=sa.Numeric(precision=12, scale=2),
+                        type_=sa.BigInteger(), existing_nullable=False)
+
+
+def downgrade():
+    # Mirror image: land in the wide DECIMAL, divide, then narrow back.
+    for table, column in reversed(_MONEY_COLUMNS):
+        op.alter_column(table, column, existing_type=sa.BigInteger(),
+                        type_=sa.Numeric(precision=12, scale=2), existing_nullable=False)
+        op.execute("UPDATE `{0}` SET {1} = {1} / 100".format(table, column))
+        op.alter_column(table, column, existing_type=sa.Numeric(precision=12, scale=2),
+                        type_=sa.Numeric(precision=10, scale=2), existing_nullable=False)
@@ -0,0 +1,30 @@
+"""narrow password_hash and account_number
+
+Revision ID: b7d22c5f01e9
+Revises: 8c41f09be7d3
+Create Date: 2026-08-31 14:28:03.550127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d22c5f01e9'
+down_revision = '8c41f09be7d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.alter_column('user', 'password_hash', existing_type=sa.String(length=255),
+                    type_=sa.String(length=192), existing_nullable=False)
+    op.alter_column('account', 'account_number', existing_type=sa.String(length=255),
+                    type_=sa.String(length=32), existing_nullable=False)
+
+
+def downgrade():
+    op.alter_column('account', 'account_number', existing_type=sa.String(length=32),
+                    type_=sa.String(length=255), existing_nullable=False)
+    op.alter_column('user', 'password_hash', existing_type=sa.String(length=192),
+                    type_=sa.String(length=255), existing_nullable=False)
@@ -0,0 +1,29 @@
+"""composite transaction index
+
+Revision ID: e5190a2c447b
+Revises: b7d22c5f01e9
+Create Date: 2026-08-31 14:35:26.489001
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5190a2c447b'
+down_revision = 'b7d22c5f01e9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_transaction_from_account_created', 'transaction',
+                    ['from_account_id', 'created_at'], unique=False)
+    # The composite prefix covers plain from_account_id lookups.
+    op.drop_index(op.f('ix_transaction_from_account_id'), table_name='transaction')
+
+
+def downgrade():
+    op.create_index(op.f('ix_transaction_from_account_id'), 'transaction',
+                    ['from_account_id'], unique=False)
+    op.drop_index('ix_transaction_from_account_created', table_name='transaction')
@@ -0,0 +1,13 @@
+# Production entry point. Run with:
+#   gunicorn -k gevent -w 4 --worker-connections 200 wsgi:app
+# Keep pool_size * workers below the MySQL max_connections limit;
+# DB_POOL_SIZE / DB_MAX_OVERFLOW tune the per-worker pool (see app/config.py).
+import pymysql
+
+# Must run before the app imports anything DB-related so gevent-patched
+# PyMySQL is picked up as the MySQLdb driver.
+pymysql.install_as_MySQLdb()
+
+from app import create_app
+
+app = create_app()